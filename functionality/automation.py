@@ -6,6 +6,10 @@ headers = {
     'Content-Type': 'application/json',
 }
 
+# Pooled so repeat commands skip the TCP + TLS handshake to Home Assistant
+session = requests.Session()
+session.headers.update(headers)
+
 def automation_command(text: str):
     agent_id = os.getenv("HOME_ASSISTANT_AGENT_ID", "conversation.home_assistant")
     json_data = {
@@ -13,6 +17,6 @@ def automation_command(text: str):
         "agent_id": agent_id
     }
     url = f'{os.getenv("HOME_ASSISTANT_URL")}/api/conversation/process'
-    response = requests.post(url, headers=headers, json=json_data)
+    response = session.post(url, json=json_data)
     res = response.json().get('response').get('speech').get('plain').get('speech')
     return res
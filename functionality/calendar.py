@@ -1,10 +1,8 @@
-import base64
-import os
+import re
 import zoneinfo
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import logging
-from google_auth_oauthlib.flow import InstalledAppFlow
 from utils.google_api import get_calendar_service
 
 logger = logging.getLogger("uvicorn")
@@ -17,8 +15,8 @@ logger = logging.getLogger("uvicorn")
 # 10 - Basil (Green)
 # 11 - Tomato (Red)
 
-SCOPES = ['https://www.googleapis.com/auth/calendar']
 TIME_ZONE = 'Asia/Kuala_Lumpur'
+MAX_UPCOMING_EVENTS = 5
 
 def verify_calendar_colors() -> bool:
     """Verify if calendar colors API is accessible and working."""
@@ -33,41 +31,31 @@ def verify_calendar_colors() -> bool:
         print(f"Error verifying calendar colors: {str(e)}")
         return False
 
+# Keyword groups checked in priority order, each compiled once into a single
+# alternation so a title/description is scanned once per group instead of once per word
+_EVENT_COLOR_RULES = [
+    (re.compile('|'.join(map(re.escape, keywords))), color_id)
+    for keywords, color_id in [
+        (['important', 'deadline', 'critical', 'priority'], 8),      # Graphite
+        (['personal', 'break', 'lunch', 'doctor', 'appointment'], 10),  # Basil
+        (['party', 'celebration', 'dinner', 'social', 'event'], 4),  # Flamingo
+        (['urgent', 'emergency', 'asap', 'immediate'], 11),          # Tomato
+        (['reminder', 'task', 'todo', 'follow up'], 5),              # Banana
+    ]
+]
+
 def get_event_color(title: str, description: str) -> int:
     """Determine event color based on title and description."""
     # Ensure inputs are strings
     title = str(title).lower()
     description = str(description).lower()
-    
+
+    for pattern, color_id in _EVENT_COLOR_RULES:
+        if pattern.search(title) or pattern.search(description):
+            return color_id
+
     # Default color for regular meetings (Blueberry)
-    color_id = 9
-    
-    # Check for important meetings/deadlines (Graphite)
-    important_keywords = ['important', 'deadline', 'critical', 'priority']
-    if any(word in title or word in description for word in important_keywords):
-        return 8
-    
-    # Check for personal appointments (Basil)
-    personal_keywords = ['personal', 'break', 'lunch', 'doctor', 'appointment']
-    if any(word in title or word in description for word in personal_keywords):
-        return 10
-    
-    # Check for social events (Flamingo)
-    social_keywords = ['party', 'celebration', 'dinner', 'social', 'event']
-    if any(word in title or word in description for word in social_keywords):
-        return 4
-    
-    # Check for urgent meetings (Tomato)
-    urgent_keywords = ['urgent', 'emergency', 'asap', 'immediate']
-    if any(word in title or word in description for word in urgent_keywords):
-        return 11
-    
-    # Check for reminders/tasks (Banana)
-    task_keywords = ['reminder', 'task', 'todo', 'follow up']
-    if any(word in title or word in description for word in task_keywords):
-        return 5
-    
-    return color_id
+    return 9
 
 def create_google_calendar_event(title: str, description: str, date: str, time: str, duration: int = 1, color_id: Optional[int] = None) -> tuple[str, str]:
     """Create a new Google Calendar event."""
@@ -116,7 +104,7 @@ def create_google_calendar_event(title: str, description: str, date: str, time:
     
     try:
         result = service.events().insert(calendarId='primary', body=event).execute()
-        logger.info(f"Created calendar event: {title}")
+        logger.info("Created calendar event: %s", title)
         
         # Schedule WhatsApp reminders for the event
         try:
@@ -126,9 +114,9 @@ def create_google_calendar_event(title: str, description: str, date: str, time:
                 title=title,
                 start_time=start_datetime
             ):
-                logger.warning(f"Failed to schedule reminders for event: {title}")
+                logger.warning("Failed to schedule reminders for event: %s", title)
         except Exception as e:
-            logger.error(f"Failed to schedule reminders: {str(e)}")
+            logger.error("Failed to schedule reminders: %s", e)
             # Continue to return the calendar link even if reminder scheduling fails
             
         # Prepare response message
@@ -139,7 +127,7 @@ def create_google_calendar_event(title: str, description: str, date: str, time:
         
         return result.get("htmlLink"), message
     except Exception as e:
-        logger.error(f"Failed to create calendar event: {str(e)}")
+        logger.error("Failed to create calendar event: %s", e)
         raise Exception(f"Failed to create calendar event: {str(e)}")
 
 def get_schedule_for_date_range(start_date: datetime, end_date: datetime) -> List[Dict]:
@@ -161,9 +149,9 @@ def get_schedule_for_date_range(start_date: datetime, end_date: datetime) -> Lis
             singleEvents=True,
             orderBy='startTime'
         ).execute()
-        logger.info(f"Retrieved {len(result.get('items', []))} events for date range")
+        logger.info("Retrieved %s events for date range", len(result.get('items', [])))
     except Exception as e:
-        logger.error(f"Failed to fetch calendar events: {str(e)}")
+        logger.error("Failed to fetch calendar events: %s", e)
         return []
     
     # Filter events to ensure they fall within the specified date range and haven't ended
@@ -194,13 +182,13 @@ def get_schedule_for_date_range(start_date: datetime, end_date: datetime) -> Lis
                 
         except (ValueError, TypeError) as e:
             parsing_errors += 1
-            logger.error(f"Error parsing dates for event {item.get('id', 'unknown')}: {str(e)}")
+            logger.error("Error parsing dates for event %s: %s", item.get('id', 'unknown'), e)
             continue  # Skip events with invalid dates
     
     if parsing_errors > 0:
-        logger.warning(f"Skipped {parsing_errors} events due to date parsing errors")
+        logger.warning("Skipped %s events due to date parsing errors", parsing_errors)
     
-    logger.info(f"Filtered to {len(filtered_items)} relevant events")
+    logger.info("Filtered to %s relevant events", len(filtered_items))
     
     return filtered_items
 
@@ -235,6 +223,11 @@ def get_tomorrows_schedule() -> List[Dict]:
     tomorrow = datetime.now() + timedelta(days=1)
     return get_schedule_for_date(tomorrow)
 
+def get_todays_and_tomorrows_schedule() -> List[Dict]:
+    """Get all scheduled items for today and tomorrow in a single request."""
+    today = datetime.now()
+    return get_schedule_for_date_range(today, today + timedelta(days=1))
+
 def cancel_specific_meeting(event_id: str) -> bool:
     """
     Cancel a specific meeting by its event ID.
@@ -261,15 +254,15 @@ def cancel_specific_meeting(event_id: str) -> bool:
             # Delete the associated reminder from Redis
             from utils.redis_utils import delete_reminder
             delete_reminder(event_id)
-            logger.info(f"Successfully cancelled event {event_id}")
+            logger.info("Successfully cancelled event %s", event_id)
         except Exception as e:
             # Log but don't fail if reminder deletion fails
-            logger.error(f"Failed to delete reminder for event {event_id}: {str(e)}")
+            logger.error("Failed to delete reminder for event %s: %s", event_id, e)
         
         return True
         
     except Exception as e:
-        logger.error(f"Error cancelling meeting: {str(e)}")
+        logger.error("Error cancelling meeting: %s", e)
         return False
 
 def get_upcoming_events(include_all_day: bool = False, include_recurring: bool = False) -> List[Dict]:
@@ -293,38 +286,35 @@ def get_upcoming_events(include_all_day: bool = False, include_recurring: bool =
         timeMax=end.isoformat(),
         orderBy='startTime',
         singleEvents=True,  # Expand recurring events
-        maxResults=5  # Limit to 5 upcoming events
+        # Over-fetch a little so skipped all-day/cancelled events don't starve the result
+        maxResults=MAX_UPCOMING_EVENTS * 2
     ).execute()
     
-    # Filter events
+    # Filter events, stopping as soon as enough have been collected
     filtered_events = []
     for event in events_result.get('items', []):
         try:
             # Skip cancelled events
             if event.get('status') == 'cancelled':
                 continue
-                
+
             # Check if it's an all-day event
             is_all_day = 'date' in event.get('start', {})
             if is_all_day and not include_all_day:
                 continue
-            
-            # Get event times
-            start = event['start'].get('dateTime', event['start'].get('date'))
+
+            # Only include events that haven't ended
             end = event['end'].get('dateTime', event['end'].get('date'))
-            
-            # Convert to datetime objects
-            start_dt = datetime.fromisoformat(start.replace('Z', '+00:00')).astimezone()
             end_dt = datetime.fromisoformat(end.replace('Z', '+00:00')).astimezone()
-            
-            # Only include events that haven't ended
             if end_dt > now:
                 filtered_events.append(event)
-                
+                if len(filtered_events) >= MAX_UPCOMING_EVENTS:
+                    break
+
         except Exception as e:
             print(f"Error processing event: {e}")
-    
-    return filtered_events[:5]  # Ensure we return at most 5 events
+
+    return filtered_events
 
 def format_events_for_cancellation(events: List[Dict]) -> str:
     """
@@ -333,6 +323,10 @@ def format_events_for_cancellation(events: List[Dict]) -> str:
     if not events:
         return "You have no upcoming regular events to cancel.\nNote: All-day events like birthdays cannot be cancelled through this system."
     
+    # Resolve the relative-day window once rather than per event
+    today = datetime.now().date()
+    tomorrow = today + timedelta(days=1)
+
     formatted_events = ["Select event to cancel:"]
     for i, event in enumerate(events, 1):
         start = event['start'].get('dateTime', event['start'].get('date'))
@@ -341,9 +335,10 @@ def format_events_for_cancellation(events: List[Dict]) -> str:
         end_dt = datetime.fromisoformat(end.replace('Z', '+00:00')).astimezone()
         
         # Format date differently if event is today
-        if start_dt.date() == datetime.now().date():
+        start_date = start_dt.date()
+        if start_date == today:
             date_str = "Today"
-        elif start_dt.date() == (datetime.now().date() + timedelta(days=1)):
+        elif start_date == tomorrow:
             date_str = "Tomorrow"
         else:
             date_str = start_dt.strftime("%A, %B %d")
@@ -459,8 +454,9 @@ def format_item_for_speech(item: Dict) -> str:
 
 def format_schedule_response(items: List[Dict], target_date: Optional[datetime] = None, show_both_days: bool = False, show_weekly: bool = False) -> str:
     """Format schedule items into a friendly, conversational message."""
-    # Filter out past events
+    # Filter out past events. One clock read serves every comparison below.
     current_time = datetime.now().astimezone()
+    today = current_time.date()
     active_items = []
     for item in items:
         end = item['end'].get('dateTime', item['end'].get('date'))
@@ -489,24 +485,22 @@ def format_schedule_response(items: List[Dict], target_date: Optional[datetime]
                 messages.append(f"On {day_str}, " + ". Then, ".join(formatted_items))
         
         if not messages:
-            week_type = "this week" if target_date and target_date.date() <= datetime.now().date() + timedelta(days=7) else "next week"
+            week_type = "this week" if target_date and target_date.date() <= today + timedelta(days=7) else "next week"
             return f"You've no meeting for {week_type}."
         
         return '. '.join(messages)
     
     if show_both_days:
-        # Get both today's and tomorrow's schedules
-        today_items = get_todays_schedule()
-        tomorrow_items = get_tomorrows_schedule()
-        
-        # Filter today's items
-        current_time = datetime.now().astimezone()
+        # Split the combined today+tomorrow fetch by day instead of querying each day again
         active_today_items = []
-        for item in today_items:
-            end = item['end'].get('dateTime', item['end'].get('date'))
-            end_dt = datetime.fromisoformat(end.replace('Z', '+00:00')).astimezone()
-            if end_dt > current_time:
+        tomorrow_items = []
+        for item in active_items:
+            start = item['start'].get('dateTime', item['start'].get('date'))
+            start_dt = datetime.fromisoformat(start.replace('Z', '+00:00')).astimezone()
+            if start_dt.date() == today:
                 active_today_items.append(item)
+            else:
+                tomorrow_items.append(item)
         
         today_msg = ""
         if not active_today_items:
@@ -527,9 +521,9 @@ def format_schedule_response(items: List[Dict], target_date: Optional[datetime]
     # Single day response
     date_str = "today"
     if target_date:
-        if target_date.date() == datetime.now().date():
+        if target_date.date() == today:
             date_str = "today"
-        elif target_date.date() == (datetime.now() + timedelta(days=1)).date():
+        elif target_date.date() == today + timedelta(days=1):
             date_str = "tomorrow"
         else:
             date_str = target_date.strftime("on %A, %B %d")
@@ -7,6 +7,18 @@ from notion_client import Client
 client = Client(auth=os.getenv('NOTION_INTEGRATION_SECRET'))
 db_id = os.getenv('NOTION_DATABASE_ID')
 
+NOTION_PAGES_URL = 'https://api.notion.com/v1/pages'
+
+# Shared by every module that writes to Notion, so pooled connections are reused and the
+# headers (including Notion-Version) are defined in one place
+notion_session = requests.Session()
+notion_session.headers.update({
+    'Authorization': f'Bearer {os.getenv("NOTION_INTEGRATION_SECRET")}',
+    'Content-Type': 'application/json',
+    'Accept': 'application/json',
+    'Notion-Version': '2022-06-28'
+})
+
 
 def add_new_page(title: str, category: str, content: str):
     data = {
@@ -17,12 +29,7 @@ def add_new_page(title: str, category: str, content: str):
             "Content": {"rich_text": [{"text": {"content": content}}]}
         }
     }
-    requests.post('https://api.notion.com/v1/pages', json=data, headers={
-        'Authorization': f'Bearer {os.getenv("NOTION_INTEGRATION_SECRET")}',
-        'Content-Type': 'application/json',
-        'Accept': 'application/json',
-        'Notion-Version': '2022-06-28'
-    })
+    notion_session.post(NOTION_PAGES_URL, json=data)
     print(f"New Notion page created with title: {title}")
     # TODO: write any detail to this page, or related terms (suggested by Gemini)
 
@@ -1,9 +1,9 @@
 import os
-import datetime
+from datetime import datetime
 import json
 
-import requests
 from notion_client import Client
+from functionality.notion_ import notion_session, NOTION_PAGES_URL
 from utils.gemini import *
 from utils.redis_utils import get_generic_cache
 from utils.whatsapp import send_whatsapp_threaded
@@ -47,12 +47,7 @@ def add_new_food(food: str, category: str, calories: int):
            "Calories": {"number": calories}
        }
    }
-   response = requests.post('https://api.notion.com/v1/pages', json=data, headers={
-       'Authorization': f'Bearer {secret}',
-       'Content-Type': 'application/json',
-       'Accept': 'application/json',
-       'Notion-Version': '2022-06-28'
-   })
+   response = notion_session.post(NOTION_PAGES_URL, json=data)
    return food
 
 def determine_meal():
@@ -1,30 +1,69 @@
-import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+import orjson
 from bs4 import BeautifulSoup
 from utils.gemini import *
 from utils.redis_utils import *
 import requests
-from tenacity import retry, stop_after_attempt
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
 
-@retry(stop=stop_after_attempt(2))
+# Shared by searches and the scraper threads so repeat calls to Serper and Crawlbase
+# reuse pooled keep-alive connections
+session = requests.Session()
+
+SERPER_SEARCH_URL = 'https://google.serper.dev/search'
+SERPER_HEADERS = {
+    'X-API-KEY': os.getenv('SERPER_DEV_API_KEY'),
+    'Content-Type': 'application/json'
+}
+CRAWLBASE_URL = 'https://api.crawlbase.com/'
+CRAWLBASE_TOKEN = os.getenv('CRAWLBASE_API_KEY')
+
+SCRAPE_CACHE_TTL = 60 * 60 * 12  # Same lifetime as the cached search results
+SCRAPE_MAX_WORKERS = 4
+SCRAPE_TIMEOUT = 45  # Overall deadline for scraping all search results, in seconds
+MAX_RETRY_WAIT = 10  # Longest wait worth retrying after, in seconds; a longer Retry-After gives up
+
+# Full-jitter exponential backoff so concurrent retries don't fire in lockstep
+_jittered_backoff = wait_random_exponential(multiplier=0.5, max=MAX_RETRY_WAIT)
+
+def _is_retryable_http_error(error: BaseException) -> bool:
+    """Retry on rate limiting (429), server errors and connection failures, not on other 4xx."""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, requests.RequestException)
+
+def _retry_after(retry_state) -> float:
+    """Seconds the server asked to wait in its Retry-After header, or 0 if it didn't say."""
+    error = retry_state.outcome.exception()
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('Retry-After', '') if response is not None else ''
+    return float(retry_after) if retry_after.isdigit() else 0.0
+
+def _wait_retry_after(retry_state) -> float:
+    """Back off with jitter, or longer when the server's Retry-After asks for it."""
+    return max(_jittered_backoff(retry_state), _retry_after(retry_state))
+
+def _stop_retrying(retry_state) -> bool:
+    """Stop after three attempts, or right away if Retry-After asks for more than MAX_RETRY_WAIT."""
+    return retry_state.attempt_number >= 3 or _retry_after(retry_state) > MAX_RETRY_WAIT
+
+@retry(stop=_stop_retrying, wait=_wait_retry_after,
+       retry=retry_if_exception(_is_retryable_http_error), reraise=True)
 def get_organic_results_serper_dev(query, num_results=3, location="Malaysia"):
     query = query.strip().replace('*', '').replace('"', '')
     if cached := get_generic_cache('get_organic_results_serper_dev:' + query):
         return cached
         
-    headers = {
-        'X-API-KEY': os.getenv('SERPER_DEV_API_KEY'),
-        'Content-Type': 'application/json'
-    }
-    data = json.dumps({
+    data = orjson.dumps({
         "q": query,
         "location": location,
         "num": num_results,
         "page": 1
     })
     
-    response = requests.post('https://google.serper.dev/search', headers=headers, data=data)
+    response = session.post(SERPER_SEARCH_URL, headers=SERPER_HEADERS, data=data)
     response.raise_for_status()
-    result = response.json()
+    result = orjson.loads(response.content)
     
     organic = result.get('organic', [])
     urls = [result['link'] for result in organic]
@@ -34,8 +73,14 @@ def get_organic_results_serper_dev(query, num_results=3, location="Malaysia"):
 
 @retry(stop=stop_after_attempt(2))
 def scrape_website_crawlbase(url: str):
+    # Pages were already being cached on success; serve repeats from there
+    # instead of paying for another Crawlbase fetch
+    if cached := get_generic_cache('scrape_website:' + url):
+        return cached
+
     try:
-        response = requests.get(f'https://api.crawlbase.com/?token={os.getenv("CRAWLBASE_API_KEY")}&url=' + url)
+        # Let requests encode the target URL; raw concatenation broke URLs containing '&' or '#'
+        response = session.get(CRAWLBASE_URL, params={'token': CRAWLBASE_TOKEN, 'url': url})
     except Exception as e:
         return ''
         
@@ -44,27 +89,33 @@ def scrape_website_crawlbase(url: str):
         paragraphs = soup.find_all('p')
         scraped_data = [p.get_text() for p in paragraphs]
         formatted_data = "\n".join(scraped_data)
-        set_generic_cache('scrape_website:' + url, formatted_data)
+        set_generic_cache('scrape_website:' + url, formatted_data, SCRAPE_CACHE_TTL)
         return formatted_data
     return ''
 
-def scrape_url_with_timeout(news_data, url):
+def scrape_url_or_empty(url):
+    """Scrape a URL, returning an empty string instead of raising on failure."""
     try:
-        result = scrape_website_crawlbase(url)
-        if result:
-            news_data.append(result)
+        return scrape_website_crawlbase(url)
     except Exception:
-        pass
+        return ''
 
 def scrape_urls_threaded(news_data: list, news_urls: list):
-    threads = []
-    for url in news_urls:
-        thread = threading.Thread(target=scrape_url_with_timeout, args=(news_data, url))
-        thread.start()
-        threads.append(thread)
-
-    for thread in threads:
-        thread.join(timeout=45)
+    """Scrape URLs on a bounded pool, appending results in the order the URLs were ranked."""
+    if not news_urls:
+        return
+
+    # Not a context manager: shutting down with wait=True would block past the deadline
+    executor = ThreadPoolExecutor(max_workers=min(SCRAPE_MAX_WORKERS, len(news_urls)))
+    futures = [executor.submit(scrape_url_or_empty, url) for url in news_urls]
+    # One overall deadline for the batch rather than up to 45s per thread join
+    wait(futures, timeout=SCRAPE_TIMEOUT)
+    # Drop URLs still queued at the deadline instead of paying for fetches nobody reads
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    for future in futures:
+        if future.done() and not future.cancelled() and future.result():
+            news_data.append(future.result())
 
 def google_search_pipeline(message: str):
     google_search_query = generate_google_search_query(message)
@@ -1,12 +1,20 @@
 import os
 import logging
+import threading
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+from cachetools import TTLCache
 from utils.google_api import get_tasks_service
 
 # Configure logging
 logger = logging.getLogger("uvicorn")
 
+# The default task list rarely changes, so avoid a tasklists().list() round-trip per task operation
+TASK_LIST_CACHE_TTL = 3600  # 1 hour
+_task_list_cache = TTLCache(maxsize=1, ttl=TASK_LIST_CACHE_TTL)
+# TTLCache isn't thread-safe and messages are handled on separate threads
+_task_list_cache_lock = threading.Lock()
+
 def get_task_lists() -> List[Dict]:
     """Get all task lists for the user."""
     logger.info("Fetching task lists")
@@ -24,8 +32,23 @@ def get_task_lists() -> List[Dict]:
         logger.error(f"Error getting task lists: {str(e)}")
         return []
 
-def get_default_task_list() -> Optional[str]:
-    """Get the ID of the default task list (usually '@default')."""
+def get_default_task_list(skip_cache: bool = False) -> Optional[str]:
+    """
+    Get the ID of the default task list (usually '@default').
+    
+    Args:
+        skip_cache: Force a fresh lookup instead of using the cached list ID
+    
+    Returns:
+        Task list ID if found, None otherwise
+    """
+    if not skip_cache:
+        with _task_list_cache_lock:
+            # A single get() so the entry can't expire between a membership check and the read
+            cached_id = _task_list_cache.get('default')
+        if cached_id:
+            return cached_id
+
     logger.info("Getting default task list")
     task_lists = get_task_lists()
     if not task_lists:
@@ -36,11 +59,19 @@ def get_default_task_list() -> Optional[str]:
     default_list = next((lst for lst in task_lists if lst['title'] == 'My Tasks'), None)
     if default_list:
         logger.info(f"Using default list: {default_list['title']}")
-        return default_list['id']
+    else:
+        # If no default list found, use the first list
+        default_list = task_lists[0]
+        logger.info(f"Using first available list: {default_list['title']}")
     
-    # If no default list found, return the first list's ID
-    logger.info(f"Using first available list: {task_lists[0]['title']}")
-    return task_lists[0]['id']
+    with _task_list_cache_lock:
+        _task_list_cache['default'] = default_list['id']
+    return default_list['id']
+
+def invalidate_task_list_cache():
+    """Drop the cached default task list ID, e.g. after a failed API call."""
+    with _task_list_cache_lock:
+        _task_list_cache.clear()
 
 def create_task(title: str, notes: Optional[str] = None, due_date: Optional[str] = None, list_id: Optional[str] = None) -> Optional[Dict]:
     """
@@ -90,6 +121,7 @@ def create_task(title: str, notes: Optional[str] = None, due_date: Optional[str]
         return result
     except Exception as e:
         logger.error(f"Error creating task: {str(e)}")
+        invalidate_task_list_cache()
         return None
 
 def get_tasks(list_id: Optional[str] = None, include_completed: bool = False) -> List[Dict]:
@@ -135,6 +167,7 @@ def get_tasks(list_id: Optional[str] = None, include_completed: bool = False) ->
         return tasks
     except Exception as e:
         logger.error(f"Error getting tasks: {str(e)}")
+        invalidate_task_list_cache()
         return []
 
 def update_task_status(task_id: str, completed: bool, list_id: Optional[str] = None) -> bool:
@@ -185,6 +218,7 @@ def update_task_status(task_id: str, completed: bool, list_id: Optional[str] = N
         return True
     except Exception as e:
         logger.error(f"Error updating task status: {str(e)}")
+        invalidate_task_list_cache()
         return False
 
 def delete_task(task_id: str, list_id: Optional[str] = None) -> bool:
@@ -217,6 +251,7 @@ def delete_task(task_id: str, list_id: Optional[str] = None) -> bool:
         return True
     except Exception as e:
         logger.error(f"Error deleting task: {str(e)}")
+        invalidate_task_list_cache()
         return False
 
 def get_upcoming_tasks(days: int = 7, include_completed: bool = False) -> List[Dict]:
@@ -247,7 +282,7 @@ def get_upcoming_tasks(days: int = 7, include_completed: bool = False) -> List[D
             due_date = datetime.fromisoformat(task['due'].rstrip('Z'))
             if due_date <= cutoff_date:
                 upcoming_tasks.append(task)
-                logger.debug(f"Added upcoming task: {task.get('title')}")
+                logger.debug("Added upcoming task: %s", task.get('title'))
     
     # Sort by due date
     upcoming_tasks.sort(key=lambda x: x.get('due', ''))
@@ -256,15 +291,15 @@ def get_upcoming_tasks(days: int = 7, include_completed: bool = False) -> List[D
 
 def format_task_for_display(task: Dict, index: int = None) -> str:
     """Format a task into a readable string optimized for text-to-speech."""
-    logger.debug(f"Formatting task for display: {task.get('title')}")
+    logger.debug("Formatting task for display: %s", task.get('title'))
     title = task.get('title', 'Untitled task')
     
     # Format due date if present
     due_str = ""
     if 'due' in task:
         due_date = datetime.fromisoformat(task['due'].rstrip('Z'))
-        due_str = f", due {due_date.strftime('%Y-%m-%d')}"
-        logger.debug(f"Task due date: {due_str}")
+        due_str = f", due {due_date.date().isoformat()}"
+        logger.debug("Task due date: %s", due_str)
     
     # Add notes if present
     notes = f"\n  Notes: {task['notes']}" if task.get('notes') else ""
@@ -274,5 +309,5 @@ def format_task_for_display(task: Dict, index: int = None) -> str:
     # Add task index if provided
     prefix = f"[{index}]" if index is not None else "-"
     formatted_task = f"{prefix} {title}{due_str}{notes}"
-    logger.debug(f"Formatted task: {formatted_task}")
+    logger.debug("Formatted task: %s", formatted_task)
     return formatted_task
\ No newline at end of file
@@ -90,7 +90,7 @@ def receive_whatsapp_message(request: Request, data: dict):
    return ok
 
 @app.post('/send-notification')
-async def send_notification(request: Request):
+async def send_notification(request: Request, background_tasks: BackgroundTasks):
    try:
        data = json.loads(await request.body())
        message = data.get('message')
@@ -99,12 +99,14 @@ async def send_notification(request: Request):
        if not message:
            raise HTTPException(status_code=400, detail="Missing message")
            
-       send_whatsapp_threaded(message)
-       logger.info(f"Notification sent: {message}")
+       # The WhatsApp calls are blocking; run them after the response on the threadpool
+       # instead of stalling the event loop (and the reminder task) for the round-trips
+       background_tasks.add_task(send_whatsapp_threaded, message)
+       logger.info(f"Notification queued: {message}")
 
        if image_url:
-           send_whatsapp_image(image_url)
-           logger.info(f"Image sent from URL: {image_url}")
+           background_tasks.add_task(send_whatsapp_image, image_url)
+           logger.info(f"Image queued from URL: {image_url}")
 
        return {'status': 'sent'}
    except Exception as e:
@@ -323,8 +325,8 @@ def logic(message: dict):
 
 async def check_reminders_task():
     """Background task to check and send meeting reminders."""
-    from utils.reminder import ReminderManager
-    sync_interval = 300  # Sync calendar every 5 minutes
+    from utils.reminder import ReminderManager, REMINDER_SYNC_INTERVAL, REMINDER_CHECK_INTERVAL
+    sync_interval = REMINDER_SYNC_INTERVAL
     last_sync = time.time()  # Initialize with current time after first sync
     
     # Disable oauth2client cache warning
@@ -340,8 +342,9 @@ async def check_reminders_task():
     
     while True:
         current_time = time.time()
+        iteration_start = time.monotonic()
         
-        # Attempt calendar sync every 5 minutes
+        # Attempt calendar sync every sync_interval seconds (5 minutes by default)
         if current_time - last_sync >= sync_interval:
             try:
                 logger.info("Starting periodic calendar sync...")
@@ -358,7 +361,10 @@ async def check_reminders_task():
             ReminderManager.check_and_send_pending_reminders()
         except Exception as e:
             logger.error(f"Error checking reminders: {str(e)}")
-        await asyncio.sleep(60)  # Check every minute
+        # Sleep only for what's left of the interval, so slow syncs don't push
+        # every following check later than it should run
+        elapsed = time.monotonic() - iteration_start
+        await asyncio.sleep(max(0, REMINDER_CHECK_INTERVAL - elapsed))
 
 @app.on_event("startup")
 async def startup_event():
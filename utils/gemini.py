@@ -6,7 +6,8 @@ import google.generativeai as genai
 import requests
 from PIL import Image
 from pydub import AudioSegment
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from utils.redis_utils import get_generic_cache, set_generic_cache
 
 # Configure logging
 logger = logging.getLogger("uvicorn")
@@ -27,6 +28,8 @@ def initialize_gemini_api():
 GEMINI_VISION_MODEL = 'gemini-2.0-flash-exp'
 GEMINI_CHAT_MODEL = 'gemini-1.5-flash'
 
+MESSAGE_TYPE_CACHE_TTL = 60 * 60 * 24 * 7  # Classification only depends on the message text
+
 retrieve_message_type_from_message_description = '''
 Based on the message type, execute some different requests to APIs or other tools.
 
@@ -139,7 +142,7 @@ def simple_prompt_request(message: str) -> str:
         
         # Add time context to message
         contextualized_message = f'''The current time is {actual_time}. {message}'''
-        logger.debug(f"Sending prompt: {contextualized_message}")
+        logger.debug("Sending prompt: %s", contextualized_message)
         
         response = model.generate_content(
             contextualized_message,
@@ -154,7 +157,7 @@ def simple_prompt_request(message: str) -> str:
             raise ValueError("Empty response from Gemini API")
             
         result = response.text.strip()
-        logger.debug(f"Received response: {result}")
+        logger.debug("Received response: %s", result)
         return result
         
     except ValueError as e:
@@ -233,6 +236,66 @@ def _get_tool(tool_name: str, description: str, parameters: dict, required: list
             )
         ])
 
+# Tool schemas don't change between calls, so build them (and their models) once at import
+# time instead of re-converting the schema on every request. The calendar tool embeds
+# today's date in its description and is still built per call.
+_MESSAGE_TYPE_TOOL = _get_tool(
+    'execute_based_on_message_type',
+    retrieve_message_type_from_message_description,
+    {"message_type": _get_func_arg_parameter(
+        'The type of message the user sent', 'string',
+        ["calendar", "image", "notion", "search", "automation", "task", "other"])})
+
+_TASK_TOOL = _get_tool('determine_task_inputs', determine_task_inputs_description, {
+    "intent": _get_func_arg_parameter(
+        'The type of task operation',
+        'string',
+        ["check_tasks", "create_task", "update_task", "delete_task"]
+    ),
+    "title": _get_func_arg_parameter(
+        'For task creation, the title/description of the task'
+    ),
+    "notes": _get_func_arg_parameter(
+        'For task creation, additional notes about the task'
+    ),
+    "due_date": _get_func_arg_parameter(
+        'For task creation, the due date in YYYY-MM-DD format if specified'
+    ),
+    "task_id": _get_func_arg_parameter(
+        'For update/delete operations, extract only the number from the message. For example: "task 1 done" -> "1", "delete task 2" -> "2", "mark task 3 complete" -> "3"'
+    ),
+    "completed": _get_func_arg_parameter(
+        'For update operations, whether to mark as completed',
+        'boolean'
+    ),
+    "include_completed": _get_func_arg_parameter(
+        'For check operations, whether to include completed tasks',
+        'boolean'
+    ),
+    "days_ahead": _get_func_arg_parameter(
+        'For check operations, number of days to look ahead',
+        'integer'
+    )
+})
+
+_NOTION_TOOL = _get_tool('determine_notion_page_inputs', determine_notion_page_inputs_description, {
+    "title": _get_func_arg_parameter('The title of the page'),
+    "category": _get_func_arg_parameter(
+        '''
+        The category of the page, default to `Note`.
+        If it is a business idea, or something about entrepreneurship, or about making money, use `Idea`.
+        If it is about work, or a project, use `Work`.
+        If it is about personal stuff, or something about the user, use `Personal`, either money on a personal level, relationships, etc.
+        Else, use `Note`.
+        ''',
+        enum_options=["Note", "Idea", "Work", "Personal"]),
+    "content": _get_func_arg_parameter('The content of the message in the user words (more detail)')
+})
+
+_MESSAGE_TYPE_MODEL = genai.GenerativeModel(model_name=GEMINI_CHAT_MODEL, tools=[_MESSAGE_TYPE_TOOL])
+_TASK_MODEL = genai.GenerativeModel(model_name=GEMINI_CHAT_MODEL, tools=[_TASK_TOOL])
+_NOTION_MODEL = genai.GenerativeModel(model_name=GEMINI_CHAT_MODEL, tools=[_NOTION_TOOL])
+
 def analyze_image(img_url: str, question: str = None) -> str:
     """
     Analyze an image using Gemini Vision API.
@@ -271,7 +334,7 @@ def analyze_image(img_url: str, question: str = None) -> str:
 
         # Prepare prompt and generate content
         prompt = f"{question or 'Describe what you see in this image'} using 25 words maximum."
-        logger.debug(f"Using prompt: {prompt}")
+        logger.debug("Using prompt: %s", prompt)
         
         model = genai.GenerativeModel(GEMINI_VISION_MODEL)
         response = model.generate_content(
@@ -358,6 +421,16 @@ def analyze_audio(audio_path: str, prompt: str) -> str:
         logger.error(f"Unexpected error in audio analysis: {e}")
         return f"Error analyzing audio: {e}"
 
+# Unambiguous command shapes (taken from the classifier examples) that can be routed
+# without asking the model. Anything that doesn't match exactly still goes to Gemini.
+_LOCAL_MESSAGE_TYPE_RULES = [
+    (re.compile(r'cancel (?:meeting|event)s? \d+'), 'calendar'),
+    (re.compile(r"(?:check|show) my (?:meetings?|schedule)|what'?s my schedule"), 'calendar'),
+    (re.compile(r'(?:show|list|check) my (?:tasks?|todos?)|list todos?'), 'task'),
+    (re.compile(r'(?:mark )?task \d+ (?:as )?(?:done|completed?)'), 'task'),
+    (re.compile(r'(?:delete|remove) task \d+'), 'task'),
+]
+
 def retrieve_message_type_from_message(message: str, user_id: str = None) -> str:
     """
     Analyzes a message to determine its type using AI.
@@ -372,19 +445,23 @@ def retrieve_message_type_from_message(message: str, user_id: str = None) -> str
     if not message:
         return ''
 
-    tool = _get_tool(
-        'execute_based_on_message_type',
-        retrieve_message_type_from_message_description,
-        {"message_type": _get_func_arg_parameter(
-            'The type of message the user sent', 'string',
-            ["calendar", "image", "notion", "search", "automation", "task", "other"])})
-            
-    model = genai.GenerativeModel(model_name=GEMINI_CHAT_MODEL, tools=[tool])
-    chat = model.start_chat(enable_automatic_function_calling=True)
+    normalized = message.strip().rstrip('.!?')
+    for pattern, message_type in _LOCAL_MESSAGE_TYPE_RULES:
+        if pattern.fullmatch(normalized):
+            return message_type
+
+    # Repeated commands ("check my meetings", "show my tasks") skip the model round-trip
+    cache_path = 'retrieve_message_type_from_message:' + message
+    if cached := get_generic_cache(cache_path):
+        return cached
+
+    chat = _MESSAGE_TYPE_MODEL.start_chat(enable_automatic_function_calling=True)
     response = chat.send_message(message)
     fc = response.candidates[0].content.parts[0].function_call
     assert fc.name == 'execute_based_on_message_type'
-    return fc.args['message_type']
+    message_type = fc.args['message_type']
+    set_generic_cache(cache_path, message_type, MESSAGE_TYPE_CACHE_TTL)
+    return message_type
 
 def determine_calendar_event_inputs(message: str, user_id: str = 'default') -> dict:
     """
@@ -430,10 +507,7 @@ def determine_calendar_event_inputs(message: str, user_id: str = 'default') -> d
                 'response': "Please add meeting details. For example: set meeting with John at 2pm."
             }
             
-        determine_with_date: str = determine_calendar_event_inputs_description.replace(
-            'time_now',
-            datetime.now().strftime('%Y-%m-%d')
-        )
+        today = date.today().isoformat()
         
         # Use AI to determine calendar intent
         calendar_action_prompt = """
@@ -454,7 +528,7 @@ def determine_calendar_event_inputs(message: str, user_id: str = 'default') -> d
         )
         
         intent = response.text.strip().lower()
-        logger.debug(f"Detected calendar intent: {intent}")
+        logger.debug("Detected calendar intent: %s", intent)
         
         if intent == 'cancel_event':
             from functionality.calendar import (
@@ -479,6 +553,7 @@ def determine_calendar_event_inputs(message: str, user_id: str = 'default') -> d
             from functionality.calendar import (
                 get_todays_schedule,
                 get_tomorrows_schedule,
+                get_todays_and_tomorrows_schedule,
                 get_this_week_schedule,
                 get_next_week_schedule,
                 format_schedule_response
@@ -503,7 +578,7 @@ def determine_calendar_event_inputs(message: str, user_id: str = 'default') -> d
                 generation_config={'temperature': 0}
             )
             timeframe = response.text.strip().lower()
-            logger.debug(f"Detected timeframe: {timeframe}")
+            logger.debug("Detected timeframe: %s", timeframe)
             
             if timeframe == 'next_week':
                 schedule = get_next_week_schedule()
@@ -518,7 +593,7 @@ def determine_calendar_event_inputs(message: str, user_id: str = 'default') -> d
                 target_date = datetime.now() + timedelta(days=1)
                 response = format_schedule_response(schedule, target_date)
             elif timeframe == 'both_days':
-                schedule = get_todays_schedule()
+                schedule = get_todays_and_tomorrows_schedule()
                 response = format_schedule_response(schedule, show_both_days=True)
             else:  # today or default
                 schedule = get_todays_schedule()
@@ -531,6 +606,7 @@ def determine_calendar_event_inputs(message: str, user_id: str = 'default') -> d
             }
             
         else:  # create_event
+            determine_with_date: str = determine_calendar_event_inputs_description.replace('time_now', today)
             tool = _get_tool('determine_calendar_event_inputs', determine_with_date, {
                 "intent": _get_func_arg_parameter(
                     'The type of calendar operation',
@@ -564,19 +640,15 @@ def determine_calendar_event_inputs(message: str, user_id: str = 'default') -> d
             chat = model.start_chat(enable_automatic_function_calling=True)
             response = chat.send_message(message)
             fc = response.candidates[0].content.parts[0].function_call
-            logger.debug(f"Function call response: {fc}")
+            logger.debug("Function call response: %s", fc)
             
             assert fc.name == 'determine_calendar_event_inputs'
             
-            # Set default date to today if not provided
-            if 'date' not in fc.args:
-                fc.args['date'] = datetime.now().strftime('%Y-%m-%d')
-                
             return {
                 'intent': 'create_event',
                 'title': fc.args['title'],
                 'description': fc.args.get('description', ''),
-                'date': fc.args['date'],
+                'date': fc.args.get('date', today),  # Default to today if not provided
                 'time': fc.args['time'],
                 'duration': fc.args.get('duration', 1),
                 'type': fc.args.get('type', 'event')
@@ -590,6 +662,50 @@ def determine_calendar_event_inputs(message: str, user_id: str = 'default') -> d
         return {'intent': 'error', 'response': f"Failed to process calendar request: {e}"}
     
 
+def _check_tasks_inputs(args) -> dict:
+    return {
+        'intent': 'check_tasks',
+        'include_completed': args.get('include_completed', False),
+        'days_ahead': args.get('days_ahead', 7)
+    }
+
+def _create_task_inputs(args) -> dict:
+    title = args.get('title', '').strip()
+    if not title:
+        return {
+            'intent': 'create_task',
+            'title': '',
+            'notes': '',
+            'due_date': None
+        }
+    return {
+        'intent': 'create_task',
+        'title': title,
+        'notes': args.get('notes', ''),
+        'due_date': args.get('due_date')
+    }
+
+def _update_task_inputs(args) -> dict:
+    return {
+        'intent': 'update_task',
+        'task_id': args['task_id'],
+        'completed': args['completed']
+    }
+
+def _delete_task_inputs(args) -> dict:
+    return {
+        'intent': 'delete_task',
+        'task_id': args['task_id']
+    }
+
+# Maps each task intent returned by Gemini to the builder for its input dict
+_TASK_INTENT_HANDLERS = {
+    'check_tasks': _check_tasks_inputs,
+    'create_task': _create_task_inputs,
+    'update_task': _update_task_inputs,
+    'delete_task': _delete_task_inputs,
+}
+
 def determine_task_inputs(message: str) -> dict:
     """
     Determine task inputs from a message using AI-driven analysis.
@@ -635,82 +751,19 @@ def determine_task_inputs(message: str) -> dict:
                 'due_date': None
             }
 
-        tool = _get_tool('determine_task_inputs', determine_task_inputs_description, {
-            "intent": _get_func_arg_parameter(
-                'The type of task operation',
-                'string',
-                ["check_tasks", "create_task", "update_task", "delete_task"]
-            ),
-            "title": _get_func_arg_parameter(
-                'For task creation, the title/description of the task'
-            ),
-            "notes": _get_func_arg_parameter(
-                'For task creation, additional notes about the task'
-            ),
-            "due_date": _get_func_arg_parameter(
-                'For task creation, the due date in YYYY-MM-DD format if specified'
-            ),
-            "task_id": _get_func_arg_parameter(
-                'For update/delete operations, extract only the number from the message. For example: "task 1 done" -> "1", "delete task 2" -> "2", "mark task 3 complete" -> "3"'
-            ),
-            "completed": _get_func_arg_parameter(
-                'For update operations, whether to mark as completed',
-                'boolean'
-            ),
-            "include_completed": _get_func_arg_parameter(
-                'For check operations, whether to include completed tasks',
-                'boolean'
-            ),
-            "days_ahead": _get_func_arg_parameter(
-                'For check operations, number of days to look ahead',
-                'integer'
-            )
-        })
-
-        model = genai.GenerativeModel(model_name=GEMINI_CHAT_MODEL, tools=[tool])
-        chat = model.start_chat(enable_automatic_function_calling=True)
+        chat = _TASK_MODEL.start_chat(enable_automatic_function_calling=True)
         response = chat.send_message(message)
         fc = response.candidates[0].content.parts[0].function_call
-        logger.debug(f"Function call response: {fc}")
+        logger.debug("Function call response: %s", fc)
 
         assert fc.name == 'determine_task_inputs'
 
         # Process based on intent
         intent = fc.args.get('intent')
-        if intent == 'check_tasks':
-            return {
-                'intent': 'check_tasks',
-                'include_completed': fc.args.get('include_completed', False),
-                'days_ahead': fc.args.get('days_ahead', 7)
-            }
-        elif intent == 'create_task':
-            title = fc.args.get('title', '').strip()
-            if not title:
-                return {
-                    'intent': 'create_task',
-                    'title': '',
-                    'notes': '',
-                    'due_date': None
-                }
-            return {
-                'intent': 'create_task',
-                'title': title,
-                'notes': fc.args.get('notes', ''),
-                'due_date': fc.args.get('due_date')
-            }
-        elif intent == 'update_task':
-            return {
-                'intent': 'update_task',
-                'task_id': fc.args['task_id'],
-                'completed': fc.args['completed']
-            }
-        elif intent == 'delete_task':
-            return {
-                'intent': 'delete_task',
-                'task_id': fc.args['task_id']
-            }
-        else:
+        handler = _TASK_INTENT_HANDLERS.get(intent)
+        if handler is None:
             raise ValueError(f"Invalid intent: {intent}")
+        return handler(fc.args)
 
     except ValueError as e:
         logger.error(f"Invalid input error: {e}")
@@ -745,27 +798,12 @@ def determine_notion_page_inputs(message: str) -> dict:
         if not message:
             raise ValueError("Message cannot be empty")
             
-        tool = _get_tool('determine_notion_page_inputs', determine_notion_page_inputs_description, {
-            "title": _get_func_arg_parameter('The title of the page'),
-            "category": _get_func_arg_parameter(
-                '''
-                The category of the page, default to `Note`.
-                If it is a business idea, or something about entrepreneurship, or about making money, use `Idea`.
-                If it is about work, or a project, use `Work`.
-                If it is about personal stuff, or something about the user, use `Personal`, either money on a personal level, relationships, etc.
-                Else, use `Note`.
-                ''',
-                enum_options=["Note", "Idea", "Work", "Personal"]),
-            "content": _get_func_arg_parameter('The content of the message in the user words (more detail)')
-        })
-        
-        model = genai.GenerativeModel(model_name=GEMINI_CHAT_MODEL, tools=[tool])
-        chat = model.start_chat(enable_automatic_function_calling=True)
+        chat = _NOTION_MODEL.start_chat(enable_automatic_function_calling=True)
         response = chat.send_message(message)
         
         try:
             fc = response.candidates[0].content.parts[0].function_call
-            logger.debug(f"Function call response: {fc}")
+            logger.debug("Function call response: %s", fc)
             
             if not fc or not fc.name:
                 raise ValueError("Invalid function call response")
@@ -3,6 +3,7 @@ from googleapiclient.discovery import build
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 import os
+import threading
 import warnings
 
 # Disable oauth2client cache warning
@@ -12,6 +13,16 @@ warnings.filterwarnings('ignore', message='file_cache is unavailable when using
 CALENDAR_SCOPE = ['https://www.googleapis.com/auth/calendar']
 TASKS_SCOPE = ['https://www.googleapis.com/auth/tasks']
 
+TOKEN_PATH = 'creds/token.json'
+
+# Loaded credentials per scope tuple, with the token.json mtime they were read at
+_CREDS_CACHE = {}
+# Serializes loading and refreshing, so concurrent message threads and the reminder
+# loop don't race to refresh the same Credentials object
+_CREDS_LOCK = threading.Lock()
+# Built services per thread, keyed by API name, alongside the credentials they were built with
+_thread_services = threading.local()
+
 class MemoryCache(Cache):
     _CACHE = {}
 
@@ -22,27 +33,61 @@ class MemoryCache(Cache):
         MemoryCache._CACHE[url] = content
 
 def get_credentials(scopes):
-    """Get and refresh credentials if needed."""
-    if not os.path.exists('creds/token.json'):
+    """
+    Get and refresh credentials if needed.
+    
+    Loaded credentials are reused until token.json changes on disk, so each service
+    request doesn't re-read and re-parse the token file.
+    """
+    try:
+        mtime = os.path.getmtime(TOKEN_PATH)
+    except OSError:
         return None
-    creds = Credentials.from_authorized_user_file('creds/token.json', scopes)
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
+
+    key = tuple(scopes)
+    with _CREDS_LOCK:
+        cached = _CREDS_CACHE.get(key)
+        if cached and cached[0] == mtime:
+            creds = cached[1]
         else:
-            return None
+            creds = Credentials.from_authorized_user_file(TOKEN_PATH, scopes)
+            _CREDS_CACHE[key] = (mtime, creds)
+
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                return None
     return creds
 
-def get_calendar_service():
-    """Get authenticated Google Calendar service."""
-    creds = get_credentials(CALENDAR_SCOPE)
+def _get_service(name, version, scopes):
+    """
+    Build an API service, reusing the one built for the same credentials on this thread.
+
+    build() parses the discovery document into resource classes on every call, so the
+    reminder loop and other long-lived threads keep theirs. Services aren't shared
+    across threads because the underlying httplib2 transport isn't thread-safe.
+    """
+    creds = get_credentials(scopes)
     if not creds:
         return None
-    return build('calendar', 'v3', credentials=creds, cache=MemoryCache())
+
+    services = getattr(_thread_services, 'services', None)
+    if services is None:
+        services = _thread_services.services = {}
+
+    cached = services.get(name)
+    if cached and cached[0] is creds:
+        return cached[1]
+
+    service = build(name, version, credentials=creds, cache=MemoryCache())
+    services[name] = (creds, service)
+    return service
+
+def get_calendar_service():
+    """Get authenticated Google Calendar service."""
+    return _get_service('calendar', 'v3', CALENDAR_SCOPE)
 
 def get_tasks_service():
     """Get authenticated Google Tasks service."""
-    creds = get_credentials(TASKS_SCOPE)
-    if not creds:
-        return None
-    return build('tasks', 'v1', credentials=creds, cache=MemoryCache())
\ No newline at end of file
+    return _get_service('tasks', 'v1', TASKS_SCOPE)
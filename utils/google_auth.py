@@ -3,13 +3,11 @@ import json
 import base64
 from google_auth_oauthlib.flow import InstalledAppFlow
 from fastapi import HTTPException
+from utils.google_api import CALENDAR_SCOPE, TASKS_SCOPE
 
 class GoogleAuth:
     _instance = None
-    SCOPES = [
-        'https://www.googleapis.com/auth/calendar',
-        'https://www.googleapis.com/auth/tasks'
-    ]
+    SCOPES = CALENDAR_SCOPE + TASKS_SCOPE
 
     def __init__(self):
         if not GoogleAuth._instance:
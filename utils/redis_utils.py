@@ -1,19 +1,41 @@
 import os
-import json
-import base64
+import hashlib
+import orjson
 import redis
 import zoneinfo
+import zstandard as zstd
 from datetime import datetime, timedelta, timezone
 
-r = redis.Redis(
+# Every WhatsApp message runs on its own thread, so share one bounded pool: bursts wait
+# briefly for a free connection instead of opening an unbounded number of sockets
+r = redis.Redis(connection_pool=redis.BlockingConnectionPool(
     host=os.getenv('REDIS_DB_HOST', 'localhost'),
     port=int(os.getenv('REDIS_DB_PORT', '6378')),
     username='default',
     password=os.getenv('REDIS_DB_PASSWORD', ''),
-    health_check_interval=30
-)
+    health_check_interval=30,
+    max_connections=int(os.getenv('REDIS_MAX_CONNECTIONS', '20')),
+    timeout=5  # Seconds to wait for a free connection before raising
+))
 
 TIME_ZONE = 'Asia/Kuala_Lumpur'
+# Keys examined per SCAN call. The default of 10 means one round-trip per ~10 keys
+# across the whole keyspace, even though only the reminder keys match.
+SCAN_COUNT = int(os.getenv('REDIS_SCAN_COUNT', '1000'))
+MGET_BATCH_SIZE = 1000  # Keys per MGET, bounds the size of a single Redis reply
+DELETE_BATCH_SIZE = 500  # Keys per DEL when removing reminders in bulk
+# Generic cache payloads at least this large are stored zstd-compressed behind a one-byte
+# marker. JSON never starts with \x01, so older uncompressed entries still read back as-is.
+CACHE_COMPRESS_MIN_BYTES = 256
+CACHE_COMPRESSED_MARKER = b'\x01'
+
+# Key templates, built once so every call formats the same prefix the same way
+KEY_PREFIX = 'josancamon:rayban-meta-glasses-api:'
+REMINDER_KEY_PREFIX = f'{KEY_PREFIX}reminder:'
+# Sorted set of event IDs scored by start time (epoch seconds). Deliberately outside the
+# reminder: prefix so reminder scans never pick it up as a reminder payload.
+REMINDER_INDEX_KEY = f'{KEY_PREFIX}reminder_index:by_time'
+CANCELLATION_KEY_PREFIX = f'{KEY_PREFIX}cancellation:wa:'
 
 
 def try_catch_decorator(func):
@@ -28,82 +50,145 @@ def try_catch_decorator(func):
 
 
 # ------------ Place ID Caching ------------
+def _generic_cache_key(path: str) -> str:
+    """
+    Build the Redis key for a generic cache path.
+
+    Paths are hashed to a fixed 32-char digest rather than base64-encoded, so long
+    URLs and messages don't turn into keys a third larger than the path itself.
+    """
+    return KEY_PREFIX + hashlib.blake2b(path.encode('utf-8'), digest_size=16).hexdigest()
+
+
 @try_catch_decorator
 def get_generic_cache(path: str):
-    key = base64.b64encode(f'{path}'.encode('utf-8'))
-    key = key.decode('utf-8')
-
-    data = r.get(f'josancamon:rayban-meta-glasses-api:{key}')
-    return json.loads(data) if data else None
+    data = r.get(_generic_cache_key(path))
+    if not data:
+        return None
+    if data[:1] == CACHE_COMPRESSED_MARKER:
+        data = zstd.ZstdDecompressor().decompress(data[1:])
+    return orjson.loads(data)
 
 
 @try_catch_decorator
 def set_generic_cache(path: str, data: dict, ttl: int = 3600):  # Default 1 hour TTL
-    key = base64.b64encode(f'{path}'.encode('utf-8'))
-    key = key.decode('utf-8')
-
-    r.set(f'josancamon:rayban-meta-glasses-api:{key}', json.dumps(data, default=str))
-    r.expire(f'josancamon:rayban-meta-glasses-api:{key}', ttl)
+    # orjson returns bytes, which redis stores as-is without another encode step
+    payload = orjson.dumps(data, default=str)
+    if len(payload) >= CACHE_COMPRESS_MIN_BYTES:
+        # Scraped pages compress well; below the threshold the frame overhead isn't worth it
+        payload = CACHE_COMPRESSED_MARKER + zstd.ZstdCompressor(level=3).compress(payload)
+    r.set(_generic_cache_key(path), payload, ex=ttl)
 
 
 @try_catch_decorator
 def delete_generic_cache(path: str):
-    key = base64.b64encode(f'{path}'.encode('utf-8'))
-    key = key.decode('utf-8')
-    r.delete(f'josancamon:rayban-meta-glasses-api{key}')
+    r.delete(_generic_cache_key(path))
 
 # ------------ Reminder Management ------------
 @try_catch_decorator
 def get_reminder_keys():
-    """Get all reminder keys."""
-    return r.keys('josancamon:rayban-meta-glasses-api:reminder:*')
+    """
+    Get all reminder keys.
+
+    Uses cursor-based SCAN rather than KEYS, which blocks the Redis server while it
+    walks the entire keyspace.
+    """
+    return list(r.scan_iter(f'{REMINDER_KEY_PREFIX}*', count=SCAN_COUNT))
+
+def _mget_existing(keys):
+    """Fetch keys with one MGET, yielding (key, raw data) for those that still exist."""
+    for key, data in zip(keys, r.mget(keys)):
+        if data:
+            yield key, data
+
+def iter_reminders():
+    """
+    Iterate over all stored reminders.
+
+    Values are fetched in MGET batches instead of one GET round-trip per key.
+
+    Yields:
+        Tuple of (key, raw data) for every reminder that still exists
+    """
+    batch = []
+    for key in r.scan_iter(f'{REMINDER_KEY_PREFIX}*', count=SCAN_COUNT):
+        batch.append(key)
+        if len(batch) >= MGET_BATCH_SIZE:
+            yield from _mget_existing(batch)
+            batch = []
+    if batch:
+        yield from _mget_existing(batch)
+
+def iter_reminders_between(min_ts: float, max_ts: float):
+    """
+    Iterate over reminders whose start time falls within a window.
+
+    Only the event IDs in the time index are looked up, so the cost follows the number
+    of reminders in the window rather than all stored reminders.
+
+    Args:
+        min_ts: Window start, epoch seconds (inclusive)
+        max_ts: Window end, epoch seconds (inclusive)
+
+    Yields:
+        Tuple of (key, raw data) for every reminder in the window that still exists
+    """
+    event_ids = r.zrangebyscore(REMINDER_INDEX_KEY, min_ts, max_ts)
+    prefix = REMINDER_KEY_PREFIX.encode()
+    for i in range(0, len(event_ids), MGET_BATCH_SIZE):
+        yield from _mget_existing([prefix + event_id for event_id in event_ids[i:i + MGET_BATCH_SIZE]])
 
 @try_catch_decorator
 def delete_reminder(event_id: str):
     """Delete a reminder by event ID."""
-    key = f'josancamon:rayban-meta-glasses-api:reminder:{event_id}'
-    r.delete(key)
+    with r.pipeline(transaction=False) as pipe:
+        pipe.delete(f'{REMINDER_KEY_PREFIX}{event_id}')
+        pipe.zrem(REMINDER_INDEX_KEY, event_id)
+        pipe.execute()
+
+@try_catch_decorator
+def delete_reminders(event_ids):
+    """Delete several reminders by event ID, along with their time index entries."""
+    event_ids = list(event_ids)
+    if not event_ids:
+        return
+    # One MULTI/EXEC, so each reminder key and its index entry go away together
+    with r.pipeline() as pipe:
+        for i in range(0, len(event_ids), DELETE_BATCH_SIZE):
+            batch = event_ids[i:i + DELETE_BATCH_SIZE]
+            pipe.delete(*[f'{REMINDER_KEY_PREFIX}{event_id}' for event_id in batch])
+            pipe.zrem(REMINDER_INDEX_KEY, *batch)
+        pipe.execute()
 
 @try_catch_decorator
 def cleanup_expired_reminders():
-    """Clean up expired reminders and old data."""
-    pattern = 'josancamon:rayban-meta-glasses-api:reminder:*'
-    for key in r.scan_iter(pattern):
-        try:
-            data = r.get(key)
-            if data:
-                reminder_data = json.loads(data)
-                start_time = reminder_data.get('start_time')
-                if start_time:
-                    # Delete reminder if event has ended
-                    kl_tz = zoneinfo.ZoneInfo(TIME_ZONE)
-                    event_time = datetime.fromisoformat(start_time.replace('Z', '+00:00')).astimezone(kl_tz)
-                    current_time = datetime.now(kl_tz)
-                    if current_time > event_time:
-                        r.delete(key)
-        except Exception as e:
-            print(f"Error cleaning up reminder {key}: {e}")
-            # If we can't parse the data, it's probably corrupted - delete it
-            r.delete(key)
+    """
+    Clean up expired reminders and old data.
+
+    Expired reminders are found through the time index, so the cost follows the number
+    that have expired rather than all stored reminders.
+    """
+    current_ts = datetime.now(zoneinfo.ZoneInfo(TIME_ZONE)).timestamp()
+    event_ids = r.zrangebyscore(REMINDER_INDEX_KEY, '-inf', f'({current_ts!r}')
+    delete_reminders(event_id.decode() for event_id in event_ids)
 
 # ------------ Calendar Event Cancellation State ------------
 @try_catch_decorator
 def set_cancellation_state(user_id: str):
     """Set cancellation state with 30-second expiry."""
-    key = f'josancamon:rayban-meta-glasses-api:cancellation:wa:{user_id}'
-    r.set(key, 'active')
-    r.expire(key, 30)  # 30 second timeout
+    key = f'{CANCELLATION_KEY_PREFIX}{user_id}'
+    r.set(key, 'active', ex=30)  # 30 second timeout
 
 @try_catch_decorator
 def get_cancellation_state(user_id: str) -> bool:
     """Check if user is in cancellation state."""
-    key = f'josancamon:rayban-meta-glasses-api:cancellation:wa:{user_id}'
+    key = f'{CANCELLATION_KEY_PREFIX}{user_id}'
     return bool(r.get(key))
 
 @try_catch_decorator
 def clear_cancellation_state(user_id: str):
     """Clear cancellation state."""
-    key = f'josancamon:rayban-meta-glasses-api:cancellation:wa:{user_id}'
+    key = f'{CANCELLATION_KEY_PREFIX}{user_id}'
     r.delete(key)
 
 # Code to connect to Redis from local machine from GCP
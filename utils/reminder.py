@@ -1,48 +1,78 @@
 import os
 import logging
 from datetime import datetime, timedelta
-import json
-from typing import Dict, Optional
+import orjson
+from typing import Dict, Iterable, Optional, Set
 
-from utils.redis_utils import r, try_catch_decorator, delete_reminder, cleanup_expired_reminders
+from googleapiclient.errors import HttpError
+
+from utils.redis_utils import (
+    r, try_catch_decorator, delete_reminder, delete_reminders, cleanup_expired_reminders, iter_reminders,
+    iter_reminders_between, REMINDER_KEY_PREFIX, REMINDER_INDEX_KEY
+)
 from utils.whatsapp import send_whatsapp_message
 from utils.google_api import get_calendar_service
 
 logger = logging.getLogger("uvicorn")
 
-REMINDER_KEY_PREFIX = "josancamon:rayban-meta-glasses-api:reminder:"
 MORNING_REMINDER_HOUR = 8  # Send morning reminders at 8 AM
 TIME_ZONE = 'Asia/Kuala_Lumpur'
+# Background loop cadence in seconds, tunable per deployment
+REMINDER_SYNC_INTERVAL = int(os.getenv('REMINDER_SYNC_INTERVAL', 300))
+REMINDER_CHECK_INTERVAL = int(os.getenv('REMINDER_CHECK_INTERVAL', 60))
+VERIFY_BATCH_SIZE = 50  # Google recommends at most 50 calls per Calendar batch request
+
+def _iter_reminders(reminders=None):
+    """Iterate over stored reminders (all of them by default) as (event_id, raw data)."""
+    for key, data in reminders if reminders is not None else iter_reminders():
+        yield key.decode().replace(REMINDER_KEY_PREFIX, ""), data
 
-def verify_event_exists(event_id: str) -> bool:
+def verify_events_exist(event_ids: Iterable[str]) -> Set[str]:
     """
-    Verify if an event still exists in Google Calendar.
-    If not, clean up the Redis reminder.
+    Verify which events still exist in Google Calendar using batched requests.
+    Redis reminders for events that no longer exist are cleaned up.
     
     Args:
-        event_id: The Google Calendar event ID
+        event_ids: The Google Calendar event IDs to check
         
     Returns:
-        bool: True if event exists, False if not
+        Set[str]: IDs of the events that still exist
     """
+    event_ids = list(event_ids)
+    if not event_ids:
+        return set()
+
     try:
         service = get_calendar_service()
         if not service:
-            return False
-            
-        try:
-            # Try to get the event
-            service.events().get(calendarId='primary', eventId=event_id).execute()
-            return True
-        except Exception:
-            # If event doesn't exist, clean up Redis
-            logger.info(f"Event {event_id} no longer exists in Google Calendar, cleaning up Redis reminder")
+            return set()
+
+        existing = set()
+        missing = []
+
+        def _on_response(request_id, response, exception):
+            if exception is None:
+                existing.add(request_id)
+            elif isinstance(exception, HttpError) and exception.resp.status in (404, 410):
+                missing.append(request_id)
+            else:
+                # Transient per-request failures (e.g. rate limits) neither confirm nor delete
+                logger.warning("Could not verify event %s: %s", request_id, exception)
+
+        for i in range(0, len(event_ids), VERIFY_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=_on_response)
+            for event_id in event_ids[i:i + VERIFY_BATCH_SIZE]:
+                batch.add(service.events().get(calendarId='primary', eventId=event_id), request_id=event_id)
+            batch.execute()
+
+        for event_id in missing:
+            logger.info("Event %s no longer exists in Google Calendar, cleaning up Redis reminder", event_id)
             delete_reminder(event_id)
-            return False
-            
+        return existing
+
     except Exception as e:
-        logger.error(f"Error verifying event existence: {e}")
-        return False
+        logger.error("Error verifying event existence: %s", e)
+        return set()
 
 class ReminderManager:
     @staticmethod
@@ -64,27 +94,39 @@ class ReminderManager:
         try:
             cleanup_expired_reminders()
         except Exception as e:
-            logger.error(f"Error cleaning up expired reminders: {e}")
+            logger.error("Error cleaning up expired reminders: %s", e)
             # Continue with sync even if cleanup fails
 
-        # Get all existing reminders from Redis
+        # Get all existing reminders from Redis in a single pass. This also catches expired
+        # or corrupted reminders the time index doesn't cover, and backfills the index for
+        # reminders stored before it existed (ZADD is idempotent for indexed ones).
+        now = datetime.now().astimezone()
         existing_reminders = {}
+        index_scores = {}
+        stale_event_ids = []
         try:
-            for key in r.scan_iter(f"{REMINDER_KEY_PREFIX}*"):
-                event_id = key.decode().replace(REMINDER_KEY_PREFIX, "")
-                data = r.get(key)
-                if data:
-                    try:
-                        existing_reminders[event_id] = json.loads(data)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Error decoding reminder data for {event_id}: {e}")
-                        delete_reminder(event_id)  # Clean up corrupted data
+            for event_id, data in _iter_reminders():
+                try:
+                    reminder_data = orjson.loads(data)
+                    start_time = ReminderManager._get_start_time(reminder_data)
+                except (orjson.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                    logger.error("Error decoding reminder data for %s: %s", event_id, e)
+                    stale_event_ids.append(event_id)  # Clean up corrupted data
+                    continue
+                if start_time < now:
+                    stale_event_ids.append(event_id)
+                    continue
+                existing_reminders[event_id] = reminder_data
+                index_scores[event_id] = start_time.timestamp()
         except Exception as e:
-            logger.error(f"Error reading existing reminders from Redis: {e}")
+            logger.error("Error reading existing reminders from Redis: %s", e)
             return False
 
+        delete_reminders(stale_event_ids)
+        if index_scores:
+            r.zadd(REMINDER_INDEX_KEY, index_scores)
+
         # Get upcoming events from Google Calendar (limit to next 7 days)
-        now = datetime.now().astimezone()
         week_later = now + timedelta(days=7)
         try:
             events_result = service.events().list(
@@ -96,16 +138,16 @@ class ReminderManager:
                 orderBy='startTime'
             ).execute()
             calendar_events = {event['id']: event for event in events_result.get('items', [])}
-            logger.info(f"Found {len(calendar_events)} upcoming events in Google Calendar")
+            logger.info("Found %s upcoming events in Google Calendar", len(calendar_events))
         except Exception as e:
-            logger.error(f"Error fetching events from Google Calendar: {e}")
+            logger.error("Error fetching events from Google Calendar: %s", e)
             return False
 
         # Remove reminders for deleted events
         deleted_count = 0
         for event_id in existing_reminders:
             if event_id not in calendar_events:
-                logger.info(f"Removing reminder for deleted event: {event_id}")
+                logger.info("Removing reminder for deleted event: %s", event_id)
                 delete_reminder(event_id)
                 deleted_count += 1
 
@@ -118,7 +160,7 @@ class ReminderManager:
                 try:
                     start_time = datetime.fromisoformat(start.replace('Z', '+00:00')).astimezone()
                 except ValueError as e:
-                    logger.error(f"Error parsing start time for event {event_id}: {e}")
+                    logger.error("Error parsing start time for event %s: %s", event_id, e)
                     continue
                 
                 # Skip birthday events for now (they'll be handled separately)
@@ -128,7 +170,7 @@ class ReminderManager:
                 
                 # Only add reminder if event is in the future
                 if start_time > now:
-                    logger.info(f"Adding reminder for new event: {event.get('summary', 'Untitled')}")
+                    logger.info("Adding reminder for new event: %s", event.get('summary', 'Untitled'))
                     try:
                         if ReminderManager.schedule_meeting_reminders(
                             event_id=event_id,
@@ -137,9 +179,9 @@ class ReminderManager:
                         ):
                             added_count += 1
                     except Exception as e:
-                        logger.error(f"Error scheduling reminder for event {event_id}: {e}")
+                        logger.error("Error scheduling reminder for event %s: %s", event_id, e)
                     
-        logger.info(f"Calendar sync completed: {added_count} added, {deleted_count} deleted, {skipped_count} skipped")
+        logger.info("Calendar sync completed: %s added, %s deleted, %s skipped", added_count, deleted_count, skipped_count)
         return True
 
     @staticmethod
@@ -163,20 +205,24 @@ class ReminderManager:
         reminder_data = {
             "title": title,
             "start_time": start_time.isoformat(),
+            # Epoch seconds, so sweeps can compare times without parsing the ISO string
+            "start_ts": start_time.timestamp(),
             "morning_reminder_sent": False,
             "hour_before_reminder_sent": False,
             "start_reminder_sent": False
         }
         
-        # Store reminder data in Redis with expiration
+        # Store reminder data in Redis, expiring 1 hour after the meeting. A single
+        # SET ... EXAT also means the key never exists without its expiry.
         key = f"{REMINDER_KEY_PREFIX}{event_id}"
-        r.set(key, json.dumps(reminder_data))
-        
-        # Set expiration for 1 hour after the meeting
         expiration = start_time + timedelta(hours=1)
-        r.expireat(key, int(expiration.timestamp()))
+        with r.pipeline() as pipe:
+            pipe.set(key, orjson.dumps(reminder_data), exat=int(expiration.timestamp()))
+            # Index by start time so due reminders can be found without scanning them all
+            pipe.zadd(REMINDER_INDEX_KEY, {event_id: reminder_data["start_ts"]})
+            pipe.execute()
         
-        logger.info(f"Scheduled reminders for '{title}' at {start_time.strftime('%I:%M %p')}.")
+        logger.info("Scheduled reminders for '%s' at %s.", title, start_time.strftime('%I:%M %p'))
         return True
 
     @staticmethod
@@ -185,18 +231,25 @@ class ReminderManager:
         """Get reminder data for an event."""
         key = f"{REMINDER_KEY_PREFIX}{event_id}"
         data = r.get(key)
-        return json.loads(data) if data else None
+        return orjson.loads(data) if data else None
 
     @staticmethod
     @try_catch_decorator
-    def mark_reminder_sent(event_id: str, reminder_type: str) -> bool:
-        """Mark a specific reminder as sent."""
+    def mark_reminder_sent(event_id: str, reminder_type: str, reminder_data: Optional[Dict] = None,
+                           client=None) -> bool:
+        """
+        Mark a specific reminder as sent.
+
+        Callers that already loaded the reminder can pass it in to skip
+        re-reading and re-decoding it from Redis, and can pass a pipeline as
+        client to batch several writes into one round-trip.
+        """
         key = f"{REMINDER_KEY_PREFIX}{event_id}"
-        data = r.get(key)
-        if not data:
-            return False
-            
-        reminder_data = json.loads(data)
+        if reminder_data is None:
+            data = r.get(key)
+            if not data:
+                return False
+            reminder_data = orjson.loads(data)
         reminder_data.setdefault("morning_reminder_sent", False)
         reminder_data.setdefault("hour_before_reminder_sent", False)
         reminder_data.setdefault("start_reminder_sent", False)
@@ -208,9 +261,19 @@ class ReminderManager:
         elif reminder_type == "start":
             reminder_data["start_reminder_sent"] = True
             
-        r.set(key, json.dumps(reminder_data))
+        # keepttl preserves the post-meeting expiry set when scheduling, and xx avoids
+        # resurrecting a reminder that was deleted while it was being sent
+        (client or r).set(key, orjson.dumps(reminder_data), keepttl=True, xx=True)
         return True
 
+    @staticmethod
+    def _get_start_time(reminder_data: Dict) -> datetime:
+        """Get a reminder's start time, preferring the stored epoch over parsing the ISO string."""
+        start_ts = reminder_data.get("start_ts")
+        if start_ts is not None:
+            return datetime.fromtimestamp(start_ts).astimezone()
+        return datetime.fromisoformat(reminder_data["start_time"]).astimezone()
+
     @staticmethod
     def _format_time(dt: datetime) -> str:
         """Format time in 12-hour format."""
@@ -220,19 +283,15 @@ class ReminderManager:
     def _collect_todays_events(now: datetime):
         """Collect all events scheduled for today."""
         todays_events = []
-        for key in r.scan_iter(f"{REMINDER_KEY_PREFIX}*"):
-            data = r.get(key)
-            if not data:
-                continue
-                
-            reminder_data = json.loads(data)
-            event_id = key.decode().replace(REMINDER_KEY_PREFIX, "")
+        end_of_day = now.replace(hour=23, minute=59, second=59, microsecond=999999)
+        for event_id, data in _iter_reminders(iter_reminders_between(now.timestamp(), end_of_day.timestamp())):
+            reminder_data = orjson.loads(data)
             
             # Skip birthday events
             if "birthday" in reminder_data.get("title", "").lower():
                 continue
                 
-            start_time = datetime.fromisoformat(reminder_data["start_time"]).astimezone()
+            start_time = ReminderManager._get_start_time(reminder_data)
             
             # Skip if event is in the past
             if start_time < now:
@@ -245,7 +304,8 @@ class ReminderManager:
                     "start_time": start_time,
                     "morning_reminder_sent": reminder_data["morning_reminder_sent"],
                     "hour_before_reminder_sent": reminder_data["hour_before_reminder_sent"],
-                    "start_reminder_sent": reminder_data.get("start_reminder_sent", False)
+                    "start_reminder_sent": reminder_data.get("start_reminder_sent", False),
+                    "reminder_data": reminder_data
                 })
         
         return sorted(todays_events, key=lambda x: x["start_time"])
@@ -269,9 +329,10 @@ class ReminderManager:
             
             if unsent_morning_reminders:
                 # Filter out events that no longer exist in Google Calendar
+                existing_events = verify_events_exist(event["event_id"] for event in unsent_morning_reminders)
                 valid_reminders = [
                     event for event in unsent_morning_reminders
-                    if verify_event_exists(event["event_id"])
+                    if event["event_id"] in existing_events
                 ]
                 
                 if valid_reminders:
@@ -283,32 +344,40 @@ class ReminderManager:
                     message = f"Good morning! Here's your schedule for today:\n{events_text}"
                     send_whatsapp_message(message)
                     
-                    # Mark all morning reminders as sent
-                    for event in valid_reminders:
-                        ReminderManager.mark_reminder_sent(event["event_id"], "morning")
+                    # Mark all morning reminders as sent in a single round-trip
+                    with r.pipeline(transaction=False) as pipe:
+                        for event in valid_reminders:
+                            ReminderManager.mark_reminder_sent(
+                                event["event_id"], "morning", event["reminder_data"], client=pipe
+                            )
+                        pipe.execute()
         
-        # Handle individual reminders (hour before and start time)
-        for key in r.scan_iter(f"{REMINDER_KEY_PREFIX}*"):
-            data = r.get(key)
-            if not data:
-                continue
-                
-            reminder_data = json.loads(data)
-            event_id = key.decode().replace(REMINDER_KEY_PREFIX, "")
+        # Handle individual reminders (hour before and start time). Only events starting
+        # between a minute ago and 65 minutes from now can be due, so look those up by index.
+        now_ts = now.timestamp()
+        pending_reminders = {}
+        for event_id, data in _iter_reminders(iter_reminders_between(now_ts - 60, now_ts + 65 * 60)):
+            reminder_data = orjson.loads(data)
             
             # Skip birthday events
             if "birthday" in reminder_data.get("title", "").lower():
                 continue
             
-            # Verify event still exists in Google Calendar
-            if not verify_event_exists(event_id):
+            pending_reminders[event_id] = reminder_data
+
+        # Verify events still exist in Google Calendar with batched requests
+        # instead of one events().get() round-trip per reminder
+        existing_events = verify_events_exist(pending_reminders)
+
+        for event_id, reminder_data in pending_reminders.items():
+            if event_id not in existing_events:
                 continue
                 
-            start_time = datetime.fromisoformat(reminder_data["start_time"]).astimezone()
+            start_time = ReminderManager._get_start_time(reminder_data)
             
             # If event is in the past, delete the reminder and continue
             if start_time < now:
-                logger.info(f"Deleting past event reminder: {reminder_data['title']}")
+                logger.info("Deleting past event reminder: %s", reminder_data['title'])
                 delete_reminder(event_id)
                 continue
                 
@@ -323,7 +392,7 @@ class ReminderManager:
                         f"at {ReminderManager._format_time(start_time)}"
                     )
                     send_whatsapp_message(message)
-                    ReminderManager.mark_reminder_sent(event_id, "hour_before")
+                    ReminderManager.mark_reminder_sent(event_id, "hour_before", reminder_data)
             
             # Check meeting start reminder
             if not reminder_data.get("start_reminder_sent", False):
@@ -331,7 +400,7 @@ class ReminderManager:
                 if timedelta(minutes=-1) <= time_until_start <= timedelta(minutes=1):
                     message = f"'{reminder_data['title']}' is starting now!"
                     send_whatsapp_message(message)
-                    ReminderManager.mark_reminder_sent(event_id, "start")
+                    ReminderManager.mark_reminder_sent(event_id, "start", reminder_data)
 
 # Function to be called by scheduler/cron job
 def check_reminders():
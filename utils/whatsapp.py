@@ -1,61 +1,81 @@
 import os
+import orjson
 import requests
 import logging
+from requests.adapters import HTTPAdapter
 
 # Use uvicorn logger
 logger = logging.getLogger("uvicorn")
 
 WHATSAPP_API_VERSION = "v21.0"
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
 GRAPH_API_BASE = "https://graph.facebook.com"
+# (connect, read) timeouts in seconds, tunable per deployment
+REQUEST_TIMEOUT = (
+   float(os.getenv('WHATSAPP_CONNECT_TIMEOUT', 5)),
+   float(os.getenv('WHATSAPP_READ_TIMEOUT', 30)),
+)
 
 headers = {
    'Authorization': f'Bearer {os.getenv("WHATSAPP_AUTH_TOKEN")}',
    'Content-Type': 'application/json',
 }
 
-def get_whatsapp_url():
-   return f"{GRAPH_API_BASE}/{WHATSAPP_API_VERSION}/{os.getenv('WHATSAPP_PHONE_ID')}/messages"
+# Shared session so every Graph API call reuses pooled keep-alive connections
+# instead of paying a new TCP + TLS handshake per message
+session = requests.Session()
+session.headers.update(headers)
+session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=10))
+
+# Message endpoint and recipient only depend on deployment config, so build them once
+WHATSAPP_MESSAGES_URL = f"{GRAPH_API_BASE}/{WHATSAPP_API_VERSION}/{os.getenv('WHATSAPP_PHONE_ID')}/messages"
+WHATSAPP_RECIPIENT = os.getenv('WHATSAPP_PHONE_NUMBER')
 
 def send_whatsapp_message(text: str):
-    logger.info(f"send_whatsapp_message: {text}")
+    logger.debug("send_whatsapp_message: %s", text)
     json_data = {
         'messaging_product': 'whatsapp',
-        'to': os.getenv('WHATSAPP_PHONE_NUMBER'),
+        'to': WHATSAPP_RECIPIENT,
         'type': 'text',
         'text': {'body': text}
     }
-    response = requests.post(get_whatsapp_url(), headers=headers, json=json_data)
-    logger.info(f"send_whatsapp_message response: {response.json()}")
+    response = session.post(WHATSAPP_MESSAGES_URL, json=json_data, timeout=REQUEST_TIMEOUT)
+    logger.info("send_whatsapp_message status: %s", response.status_code)
+    logger.debug("send_whatsapp_message response: %s", response.content)
 
 def send_whatsapp_image(content):
-    logger.info(f"send_whatsapp_image: sending image with content {content}")
+    logger.debug("send_whatsapp_image: sending image with content %s", content)
     json_data = {
         'messaging_product': 'whatsapp',
-        'to': os.getenv('WHATSAPP_PHONE_NUMBER'),
+        'to': WHATSAPP_RECIPIENT,
         'type': 'image',
         'image': {'link': content}
     }
-    response = requests.post(get_whatsapp_url(), headers=headers, json=json_data)
-    logger.info(f"send_whatsapp_image response: {response.json()}")
+    response = session.post(WHATSAPP_MESSAGES_URL, json=json_data, timeout=REQUEST_TIMEOUT)
+    logger.info("send_whatsapp_image status: %s", response.status_code)
+    logger.debug("send_whatsapp_image response: %s", response.content)
 
 def download_file(file_data):
-    logger.info(f"download_file: processing file data {file_data}")
-    res = requests.get(f'{GRAPH_API_BASE}/{WHATSAPP_API_VERSION}/{file_data["id"]}/', headers=headers)
-    logger.info(f"download_file metadata response: {res.json()}")
-    url = res.json()['url']
-    response = requests.get(url, headers=headers)
+    logger.debug("download_file: processing file data %s", file_data)
+    res = session.get(f'{GRAPH_API_BASE}/{WHATSAPP_API_VERSION}/{file_data["id"]}/', timeout=REQUEST_TIMEOUT)
+    metadata = orjson.loads(res.content)
+    logger.debug("download_file metadata response: %s", metadata)
+    url = metadata['url']
     if not os.path.exists('media/'):
         os.makedirs('media/')
         logger.info("Created media directory")
 
     file_format = 'ogg' if 'audio' in file_data['mime_type'] else 'jpg'
-    if response.status_code == 200:
-        with open(f'media/{file_data["id"]}.{file_format}', "wb") as f:
-            f.write(response.content)
-        logger.info(f"Media file successfully downloaded to media/{file_data['id']}.{file_format}")
-        return f'media/{file_data["id"]}.{file_format}'
-    else:
-        logger.info(f"Download failed. Status code: {response.status_code}")
+    # Stream the media straight to disk instead of buffering the whole file in memory
+    with session.get(url, stream=True, timeout=REQUEST_TIMEOUT) as response:
+        if response.status_code == 200:
+            with open(f'media/{file_data["id"]}.{file_format}', "wb") as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+            logger.info(f"Media file successfully downloaded to media/{file_data['id']}.{file_format}")
+            return f'media/{file_data["id"]}.{file_format}'
+        else:
+            logger.info(f"Download failed. Status code: {response.status_code}")
 
 def send_whatsapp_threaded(message: str):
    send_whatsapp_message(message)
\ No newline at end of file